@@ -2,7 +2,7 @@ from dataclasses import dataclass
 from typing import Any, Optional
 
 
-@dataclass
+@dataclass(frozen=True)
 class Response:
     timeout: bool = False
     error: Optional[int] = None
@@ -15,3 +15,6 @@ class Response:
             return False
 
         return not self.timeout and self.error == 0 and self.valid
+
+
+TIMEOUT = Response(timeout=True)
@@ -4,14 +4,20 @@
 # This file is part of a project licensed under the MIT License.
 # See the LICENSE file in the project root for full license text.
 
+import contextlib
+import itertools
+import struct
 import time
 from dataclasses import dataclass, field
-from typing import Dict, Generator, List, Optional, Tuple
+from functools import lru_cache
+from typing import ClassVar, Dict, Generator, Iterable, List, Optional, Sequence, Tuple
 
 from serial import Serial
 from tqdm.auto import tqdm, trange
 
-from .response import Response
+from .response import TIMEOUT, Response
+
+HEADER = b"\xff\xff"
 
 BROADCAST_ID = 0xFE
 
@@ -25,29 +31,87 @@ REBOOT = 0x08
 SYNC_WRITE = 0x83
 BULK_READ = 0x92
 
+READ_PACKET = struct.Struct("8B")
+
+SYNC_CODES = {1: "b", 2: "h", 4: "i"}
+
+
+def sync_code(length: int, signed: bool) -> Optional[str]:
+    code = SYNC_CODES.get(length)
+
+    if code is None or signed:
+        return code
+
+    return code.upper()
+
+
+def calc_checksum(packet: Sequence[int]) -> int:
+    return ~sum(packet[2:]) & 0xFF
+
+
+def pack_read(dxl_id: int, address: int, length: int) -> bytes:
+    checksum = ~(dxl_id + 4 + READ + address + length) & 0xFF
+    return READ_PACKET.pack(0xFF, 0xFF, dxl_id, 4, READ, address, length, checksum)
+
+
+def pack_write(
+    dxl_id: int,
+    instruction: int,
+    address: int,
+    length: int,
+    value: int,
+    signed: bool = False,
+) -> bytes:
+    packet = bytearray(HEADER)
+    packet.append(dxl_id)
+    packet.append(length + 3)
+    packet.append(instruction)
+    packet.append(address)
+    packet += value.to_bytes(length, "little", signed=signed)
+
+    packet.append(calc_checksum(packet))
 
-def calc_checksum(packet: List[int]) -> int:
-    return ~(sum(packet[2:]) & 0xFF) & 0xFF
+    return bytes(packet)
 
 
-def split_bytes(data: int, *, n_bytes: int = 2, signed: bool = False) -> List[int]:
-    array = data.to_bytes(n_bytes, byteorder="little", signed=signed)
-    return list(array)
+def pack_sync_write(
+    address: int, length: int, values: Dict[int, int], signed: bool = False
+) -> bytes:
+    packet = bytearray(HEADER)
+    packet.append(BROADCAST_ID)
+    packet.append(len(values) * (length + 1) + 4)
+    packet.append(SYNC_WRITE)
+    packet.append(address)
+    packet.append(length)
 
+    for dxl_id, value in values.items():
+        packet.append(dxl_id)
+        packet += value.to_bytes(length, "little", signed=signed)
 
-def merge_bytes(array: List[int], signed: bool = False) -> int:
+    packet.append(calc_checksum(packet))
+
+    return bytes(packet)
+
+
+def split_bytes(data: int, *, n_bytes: int = 2, signed: bool = False) -> bytes:
+    return data.to_bytes(n_bytes, byteorder="little", signed=signed)
+
+
+def merge_bytes(array: Iterable[int], signed: bool = False) -> int:
     return int.from_bytes(array, byteorder="big", signed=signed)
 
 
 class Params:
-    def __init__(self, params: Optional[List[int]] = None) -> None:
+    __slots__ = ("params",)
+
+    def __init__(self, params: Optional[Iterable[int]] = None) -> None:
         if params is None:
-            params = []
+            params = b""
 
-        self.params = params
+        self.params = bytearray(params)
 
     def add(self, value: int, n_bytes: int = 1, signed: bool = False) -> None:
-        self.params.extend(split_bytes(value, n_bytes=n_bytes, signed=signed))
+        self.params += value.to_bytes(n_bytes, "little", signed=signed)
 
     def parse_bytes(self, signed: bool) -> int:
         return merge_bytes(self.params, signed)
@@ -63,38 +127,39 @@ class InstructionPacket:
     instruction: int
     params: Params = field(default_factory=Params)
 
-    header: List[int] = field(
-        default_factory=lambda: [0xFF, 0xFF],
-        init=False,
-    )
+    header: ClassVar[bytes] = HEADER
     length: int = field(init=False)
     checksum: int = field(init=False)
+    _raw: bytes = field(init=False, repr=False, compare=False)
 
     @property
     def raw(self) -> bytes:
-        packet = []
-        packet.extend(self.header)
-        packet.append(self.packet_id)
-        packet.append(self.length)
-        packet.append(self.instruction)
-        packet.extend(self.params.raw)
-        packet.extend(split_bytes(self.checksum))
-        return bytes(packet)
+        return self._raw
 
     def __post_init__(self) -> None:
-        object.__setattr__(self, "length", len(self.params.raw) + 2)
+        object.__setattr__(self, "length", len(self.params.params) + 2)
 
-        packet = []
-        packet.extend(self.header)
+        packet = bytearray(self.header)
         packet.append(self.packet_id)
-        packet.extend(split_bytes(self.length))
+        packet.append(self.length)
         packet.append(self.instruction)
-        packet.extend(self.params.raw)
+        packet += self.params.params
         object.__setattr__(self, "checksum", calc_checksum(packet))
 
+        packet.append(self.checksum)
+        object.__setattr__(self, "_raw", bytes(packet))
+
+
+@lru_cache(maxsize=None)
+def pack_command(dxl_id: int, instruction: int, params: bytes = b"") -> bytes:
+    # frames without runtime values only depend on the id, so build each once
+    return InstructionPacket(dxl_id, instruction, Params(params)).raw
+
 
 @dataclass
 class StatusPacket:
+    __slots__ = ("_raw", "checksum", "error", "header", "length", "packet_id", "params")
+
     packet_id: int
     length: int
     error: int
@@ -103,28 +168,25 @@ class StatusPacket:
 
     header: Tuple[int, int]
 
-    def __init__(self, buffer: List[int]) -> None:
-        self.header = (buffer[0], buffer[1])
-        self.packet_id = buffer[2]
-        self.length = buffer[3]
-        self.error = buffer[4]
-        self.params = Params(buffer[5:-1])
-        self.checksum = buffer[-1]
+    def __init__(self, buffer: Sequence[int]) -> None:
+        raw = bytes(buffer)
+
+        self.header = (raw[0], raw[1])
+        self.packet_id = raw[2]
+        self.length = raw[3]
+        self.error = raw[4]
+        self.params = Params(memoryview(raw)[5:-1])
+        self.checksum = raw[-1]
+
+        self._raw = raw
 
     @property
     def raw(self) -> bytes:
-        packet: List[int] = []
-        packet.extend(self.header)
-        packet.append(self.packet_id)
-        packet.append(self.length)
-        packet.append(self.error)
-        packet.extend(self.params.raw)
-        packet.append(self.checksum)
-        return bytes(packet)
+        return self._raw
 
     @property
     def valid(self) -> bool:
-        return calc_checksum(list(self.raw)[:-1]) == self.checksum
+        return calc_checksum(memoryview(self._raw)[:-1]) == self.checksum
 
 
 class Connection:
@@ -135,115 +197,239 @@ class Connection:
 
         self.serial.port = port
 
+        self.buffer = bytearray()
+
     def open(self) -> None:
         self.serial.open()
 
+        # usb serial adapters buffer reads for up to 16ms unless told otherwise
+        with contextlib.suppress(AttributeError, ValueError, NotImplementedError):
+            self.serial.set_low_latency_mode(True)
+
+        self.buffer.clear()
+
     def close(self) -> None:
         self.serial.close()
+        self.buffer.clear()
 
     def set_baudrate(self, baudrate: int) -> None:
         self.serial.baudrate = baudrate
+        self.buffer.clear()
+
+    def set_timeout(self, timeout: Optional[float]) -> None:
+        self.serial.timeout = timeout
+
+    def prefetch(self, size: int) -> None:
+        # drain everything already received so later reads skip the syscall
+        if len(self.buffer) < size:
+            size_left = size - len(self.buffer)
+            self.buffer += self.serial.read(max(size_left, self.serial.in_waiting))
 
-    def read_header(self) -> List[int]:
-        header = [0xFF, 0xFF]
+    def read(self, size: int) -> bytearray:
+        self.prefetch(size)
+
+        data = self.buffer[:size]
+        del self.buffer[:size]
+
+        return data
+
+    @contextlib.contextmanager
+    def batch(self, size: int) -> Generator[None, None, None]:
+        # wait once for the status packets of every motor
+        self.prefetch(size)
+
+        if len(self.buffer) >= size:
+            yield
+            return
+
+        # the batch already waited out the timeout, only parse what arrived
+        timeout = self.serial.timeout
+        self.serial.timeout = 0
+        try:
+            yield
+        finally:
+            self.serial.timeout = timeout
+
+    def read_header(self) -> bytearray:
+        header = HEADER
+        buffer = self.buffer
 
         length = len(header)
-        packet: List[int] = []
-        header_found = False
-        t0 = time.time()
-        while not header_found:
-            packet.extend(list(self.serial.read(length - len(packet))))
-
-            for _ in range(len(packet)):
-                if packet[:length] == header:
-                    header_found = True
-                    break
-
-                packet.pop(0)
-
-            if self.serial.timeout is not None and time.time() - t0 >= (
-                self.serial.timeout * length
-            ):
+
+        deadline = None
+        if self.serial.timeout is not None:
+            deadline = time.monotonic_ns() + int(self.serial.timeout * 1e9)
+
+        while True:
+            self.prefetch(length)
+
+            # skip any garbage in front of the header in one scan
+            index = buffer.find(header)
+            if index >= 0:
+                del buffer[:index]
+                break
+
+            # keep a trailing partial header for the next read
+            del buffer[: len(buffer) - length + 1]
+
+            if deadline is not None and time.monotonic_ns() >= deadline:
                 break
 
+        packet = buffer[:length]
+        del buffer[:length]
+
         return packet
 
     def read_packet(self) -> Optional[StatusPacket]:
+        packet = self.read_frame()
+
+        if packet is None:
+            return None
+
+        return StatusPacket(packet)
+
+    def read_frame(self) -> Optional[bytearray]:
         packet = self.read_header()
 
         if len(packet) < 2:
             return None
 
-        buffer = list(self.serial.read(2))
-        packet.extend(buffer)
+        # peek at the length so the id, length and body come out in one slice
+        self.prefetch(2)
 
-        if len(buffer) < 2:
+        if len(self.buffer) < 2:
+            self.buffer.clear()
             return None
 
-        _, length = buffer
+        size = self.buffer[1] + 2
 
-        rest = list(self.serial.read(length))
-        packet.extend(rest)
+        rest = self.read(size)
+        packet += rest
 
-        if len(rest) < length:
+        if len(rest) < size:
             return None
 
-        rx = StatusPacket(packet)
-
-        return rx
+        return packet
 
     def stream_packets(
         self, count: Optional[int] = None
     ) -> Generator[Optional[StatusPacket], None, None]:
+        read_packet = self.read_packet
+
         if count is None:
             while True:
-                yield self.read_packet()
+                yield read_packet()
 
         else:
             for _ in range(count):
-                yield self.read_packet()
+                yield read_packet()
 
     def write_packet(self, tx: InstructionPacket) -> None:
-        buffer = tx.raw
+        self.write(tx.raw)
+
+    def write(self, buffer: bytes) -> None:
+        view = memoryview(buffer)
 
         count = 0
-        while count < len(buffer):
-            count = self.serial.write(buffer)
-            buffer = buffer[count:]
+        while count < len(view):
+            count += self.serial.write(view[count:])
 
 
 class SyncParams(Params):
     def __init__(self, address: int, length: int, signed: bool = False) -> None:
-        super().__init__()
-        self.add(address)
-        self.add(length)
+        super().__init__((address, length))
 
         self.length = length
         self.num_motors = 0
         self.signed = signed
 
+        self.code = sync_code(length, signed)
+
+        # packs an id and its value together for the common field widths
+        self.entry = None
+        if self.code is not None:
+            self.entry = struct.Struct(f"<B{self.code}")
+
     def add_value(self, dxl_id: int, value: int) -> None:
-        self.add(dxl_id)
-        self.add(value, self.length, self.signed)
+        if self.entry is not None:
+            # keep the OverflowError that to_bytes raises for values out of range
+            try:
+                self.params += self.entry.pack(dxl_id, value)
+            except struct.error as error:
+                raise OverflowError(error) from error
+        else:
+            self.params.append(dxl_id)
+            self.params += value.to_bytes(self.length, "little", signed=self.signed)
 
         self.num_motors += 1
 
+    def add_values(self, dxl_ids: Sequence[int], values: Sequence[int]) -> None:
+        assert len(dxl_ids) == len(values), "Each id needs exactly one value"
+
+        if self.code is None:
+            for dxl_id, value in zip(dxl_ids, values):
+                self.add_value(dxl_id, value)
+            return
+
+        # pack every id and value pair in a single call
+        items = itertools.chain.from_iterable(zip(dxl_ids, values))
+        try:
+            self.params += struct.pack(f"<{('B' + self.code) * len(dxl_ids)}", *items)
+        except struct.error as error:
+            raise OverflowError(error) from error
+
+        self.num_motors += len(dxl_ids)
+
+
+class SyncWriteTemplate:
+    def __init__(
+        self, address: int, length: int, dxl_ids: Sequence[int], signed: bool = False
+    ) -> None:
+        self.length = length
+        self.signed = signed
+
+        values = dict.fromkeys(dxl_ids, 0)
+        self.packet = bytearray(pack_sync_write(address, length, values, signed))
+
+        # values sit right after their id, entries start after the address and length
+        self.offsets = {
+            dxl_id: 8 + index * (length + 1) for index, dxl_id in enumerate(values)
+        }
+
+        # running byte sum of the frame so updates only touch the changed bytes
+        self.total = sum(memoryview(self.packet)[2:-1]) & 0xFF
+
+    def set_value(self, dxl_id: int, value: int) -> None:
+        start = self.offsets[dxl_id]
+        end = start + self.length
+
+        data = value.to_bytes(self.length, "little", signed=self.signed)
+        self.total = (self.total + sum(data) - sum(self.packet[start:end])) & 0xFF
+        self.packet[start:end] = data
+
+    @property
+    def raw(self) -> bytes:
+        self.packet[-1] = ~self.total & 0xFF
+        return bytes(self.packet)
+
 
 class BulkParams(Params):
     def __init__(self) -> None:
         super().__init__([0x00])
 
         self.num_motors = 0
+        self.lengths: List[int] = []
         self.signs: List[bool] = []
 
     def add_address(
         self, dxl_id: int, address: int, length: int, signed: bool = False
     ) -> None:
-        self.add(length)
-        self.add(dxl_id)
-        self.add(address)
+        self.params.append(length)
+        self.params.append(dxl_id)
+        self.params.append(address)
 
         self.num_motors += 1
+        self.lengths.append(length)
         self.signs.append(signed)
 
 
@@ -262,7 +448,9 @@ class MotorBus:
     def set_baudrate(self, baudrate: int) -> None:
         self.conn.set_baudrate(baudrate)
 
-    def scan(self, baudrates: Optional[List[int]] = None) -> Dict[int, List[int]]:
+    def scan(
+        self, baudrates: Optional[List[int]] = None, timeout: Optional[float] = None
+    ) -> Dict[int, List[int]]:
         if baudrates is None:
             baudrates = [
                 9600,
@@ -277,33 +465,45 @@ class MotorBus:
                 10_500_000,
             ]
 
-        all_motors = {}
-        for baudrate in tqdm(baudrates, desc="Scanning...", dynamic_ncols=True):
-            self.set_baudrate(baudrate)
-
-            motors = []
-            for dxl_id in trange(
-                0, 0xFE, desc=f"baudrate {baudrate}", leave=False, dynamic_ncols=True
-            ):
-                r = self.ping(dxl_id)
-
-                if r.ok:
-                    motors.append(dxl_id)
+        # every missing id waits out the timeout, so scans can use a shorter one
+        previous_timeout = self.conn.serial.timeout
+        if timeout is not None:
+            self.conn.set_timeout(timeout)
 
-            if len(motors):
-                tqdm.write(f"Found {motors} on baudrate {baudrate}.")
-                all_motors[baudrate] = motors
+        all_motors = {}
+        try:
+            for baudrate in tqdm(baudrates, desc="Scanning...", dynamic_ncols=True):
+                self.set_baudrate(baudrate)
+
+                motors = []
+                for dxl_id in trange(
+                    0,
+                    0xFE,
+                    desc=f"baudrate {baudrate}",
+                    leave=False,
+                    dynamic_ncols=True,
+                ):
+                    r = self.ping(dxl_id)
+
+                    if r.ok:
+                        motors.append(dxl_id)
+
+                if len(motors):
+                    tqdm.write(f"Found {motors} on baudrate {baudrate}.")
+                    all_motors[baudrate] = motors
+
+        finally:
+            self.conn.set_timeout(previous_timeout)
 
         return all_motors
 
     def ping(self, dxl_id: int) -> Response:
-        tx = InstructionPacket(dxl_id, PING)
-        self.conn.write_packet(tx)
+        self.conn.write(pack_command(dxl_id, PING))
 
         rx = self.conn.read_packet()
 
         if rx is None:
-            return Response(timeout=True)
+            return TIMEOUT
 
         if not rx.valid or rx.error:
             return Response(error=rx.error, valid=rx.valid)
@@ -313,18 +513,21 @@ class MotorBus:
     def read(
         self, dxl_id: int, address: int, length: int, signed: bool = False
     ) -> Response:
-        tx = InstructionPacket(dxl_id, READ, Params([address, length]))
-        self.conn.write_packet(tx)
+        self.conn.write(pack_read(dxl_id, address, length))
 
-        rx = self.conn.read_packet()
+        # decode straight from the frame without copying the params out
+        frame = self.conn.read_frame()
 
-        if rx is None:
-            return Response(timeout=True)
+        if frame is None:
+            return TIMEOUT
 
-        if not rx.valid or rx.error:
-            return Response(error=rx.error, valid=rx.valid)
+        error = frame[4]
+        valid = calc_checksum(memoryview(frame)[:-1]) == frame[-1]
 
-        data = rx.params.parse_bytes(signed)
+        if not valid or error:
+            return Response(error=error, valid=valid)
+
+        data = merge_bytes(memoryview(frame)[5:-1], signed)
         return Response(error=0, valid=True, data=data)
 
     def _write(
@@ -336,11 +539,7 @@ class MotorBus:
         value: int,
         signed: bool,
     ) -> Optional[Response]:
-        params = Params([address])
-        params.add(value, length, signed)
-
-        tx = InstructionPacket(dxl_id, instruction, params)
-        self.conn.write_packet(tx)
+        self.conn.write(pack_write(dxl_id, instruction, address, length, value, signed))
 
         if dxl_id == BROADCAST_ID:
             return None
@@ -348,7 +547,7 @@ class MotorBus:
         rx = self.conn.read_packet()
 
         if rx is None:
-            return Response(timeout=True)
+            return TIMEOUT
 
         return Response(error=rx.error, valid=rx.valid, data=[])
 
@@ -363,20 +562,14 @@ class MotorBus:
         return self._write(dxl_id, REG_WRITE, address, length, value, signed)
 
     def _send(
-        self, dxl_id: int, instruction: int, buffer: Optional[List[int]] = None
+        self, dxl_id: int, instruction: int, params: Sequence[int] = ()
     ) -> Response:
-        if buffer is None:
-            buffer = []
-
-        params = Params(buffer)
-
-        tx = InstructionPacket(dxl_id, instruction, params)
-        self.conn.write_packet(tx)
+        self.conn.write(pack_command(dxl_id, instruction, bytes(params)))
 
         rx = self.conn.read_packet()
 
         if rx is None:
-            return Response(timeout=True)
+            return TIMEOUT
 
         if not rx.valid or rx.error:
             return Response(error=rx.error, valid=rx.valid)
@@ -384,8 +577,7 @@ class MotorBus:
         return Response(error=rx.error, valid=rx.valid, data=[])
 
     def action(self) -> None:
-        tx = InstructionPacket(BROADCAST_ID, ACTION)
-        self.conn.write_packet(tx)
+        self.conn.write(pack_command(BROADCAST_ID, ACTION))
 
     def factory_reset(self, dxl_id: int) -> Response:
         assert dxl_id != BROADCAST_ID, (
@@ -405,7 +597,7 @@ class MotorBus:
         rx = self.conn.read_packet()
 
         if rx is None:
-            return Response(timeout=True)
+            return TIMEOUT
 
         if not rx.valid or rx.error != 0:
             return Response(error=rx.error, valid=rx.valid)
@@ -420,19 +612,26 @@ class MotorBus:
         tx = InstructionPacket(BROADCAST_ID, BULK_READ, params)
         self.conn.write_packet(tx)
 
-        data = []
-        for rx, sign in zip(
-            self.conn.stream_packets(count=params.num_motors), params.signs
-        ):
-            if rx is None:
-                return Response(timeout=True)
+        # wait for every status packet at once instead of one read per motor
+        size = sum(params.lengths) + 6 * params.num_motors
+        with self.conn.batch(size):
+            # decode straight from the frames without building status packets
+            data = []
+            for sign in params.signs:
+                frame = self.conn.read_frame()
+
+                if frame is None:
+                    return TIMEOUT
+
+                error = frame[4]
+                valid = calc_checksum(memoryview(frame)[:-1]) == frame[-1]
 
-            if not rx.valid or rx.error != 0:
-                return Response(error=rx.error, valid=rx.valid)
+                if not valid or error != 0:
+                    return Response(error=error, valid=valid)
 
-            data.append(rx.params.parse_bytes(sign))
+                data.append(merge_bytes(memoryview(frame)[5:-1], sign))
 
         if len(data) == 0:
-            return Response(timeout=True)
+            return TIMEOUT
 
         return Response(error=0, valid=True, data=data)
@@ -4,15 +4,37 @@
 # This file is part of a project licensed under the MIT License.
 # See the LICENSE file in the project root for full license text.
 
+import contextlib
+import itertools
+import struct
 import time
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from enum import Enum
-from typing import Dict, Generator, List, Optional, Tuple
+from functools import lru_cache
+from typing import (
+    Callable,
+    ClassVar,
+    Dict,
+    Generator,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
 
 from serial import Serial
 from tqdm.auto import tqdm
 
-from .response import Response
+from .response import TIMEOUT, Response
+
+HEADER = b"\xff\xff\xfd\x00"
+
+# id, length, instruction and error of a status packet
+STATUS_FIELDS = struct.Struct("<BHBB")
+CRC_FIELD = struct.Struct("<H")
+
+SYNC_CODES = {1: "b", 2: "h", 4: "i"}
 
 BROADCAST_ID = 0xFE
 
@@ -33,69 +55,140 @@ BULK_WRITE = 0x93
 FAST_BULK_READ = 0x9A
 
 
-def split_bytes(data: int, *, n_bytes: int = 2, signed: bool = False) -> List[int]:
-    array = data.to_bytes(n_bytes, byteorder="little", signed=signed)
-    return list(array)
+def sync_code(length: int, signed: bool) -> Optional[str]:
+    code = SYNC_CODES.get(length)
+
+    if code is None or signed:
+        return code
+
+    return code.upper()
+
+
+@lru_cache(maxsize=None)
+def nested_struct(code: str, count: int) -> struct.Struct:
+    # id and data of the first motor, then crc, error, id and data of the rest
+    return struct.Struct(f"<x{code}" + f"2xBB{code}" * (count - 1))
+
 
+def split_bytes(data: int, *, n_bytes: int = 2, signed: bool = False) -> bytes:
+    return data.to_bytes(n_bytes, byteorder="little", signed=signed)
 
-def merge_bytes(array: List[int], signed: bool = False) -> int:
+
+def merge_bytes(array: Sequence[int], signed: bool = False) -> int:
     return int.from_bytes(array, byteorder="little", signed=signed)
 
 
-def calc_crc_16(packet: List[int]) -> int:
-    crc_table = [
-        0x0000, 0x8005, 0x800F, 0x000A, 0x801B, 0x001E, 0x0014, 0x8011,
-        0x8033, 0x0036, 0x003C, 0x8039, 0x0028, 0x802D, 0x8027, 0x0022,
-        0x8063, 0x0066, 0x006C, 0x8069, 0x0078, 0x807D, 0x8077, 0x0072,
-        0x0050, 0x8055, 0x805F, 0x005A, 0x804B, 0x004E, 0x0044, 0x8041,
-        0x80C3, 0x00C6, 0x00CC, 0x80C9, 0x00D8, 0x80DD, 0x80D7, 0x00D2,
-        0x00F0, 0x80F5, 0x80FF, 0x00FA, 0x80EB, 0x00EE, 0x00E4, 0x80E1,
-        0x00A0, 0x80A5, 0x80AF, 0x00AA, 0x80BB, 0x00BE, 0x00B4, 0x80B1,
-        0x8093, 0x0096, 0x009C, 0x8099, 0x0088, 0x808D, 0x8087, 0x0082,
-        0x8183, 0x0186, 0x018C, 0x8189, 0x0198, 0x819D, 0x8197, 0x0192,
-        0x01B0, 0x81B5, 0x81BF, 0x01BA, 0x81AB, 0x01AE, 0x01A4, 0x81A1,
-        0x01E0, 0x81E5, 0x81EF, 0x01EA, 0x81FB, 0x01FE, 0x01F4, 0x81F1,
-        0x81D3, 0x01D6, 0x01DC, 0x81D9, 0x01C8, 0x81CD, 0x81C7, 0x01C2,
-        0x0140, 0x8145, 0x814F, 0x014A, 0x815B, 0x015E, 0x0154, 0x8151,
-        0x8173, 0x0176, 0x017C, 0x8179, 0x0168, 0x816D, 0x8167, 0x0162,
-        0x8123, 0x0126, 0x012C, 0x8129, 0x0138, 0x813D, 0x8137, 0x0132,
-        0x0110, 0x8115, 0x811F, 0x011A, 0x810B, 0x010E, 0x0104, 0x8101,
-        0x8303, 0x0306, 0x030C, 0x8309, 0x0318, 0x831D, 0x8317, 0x0312,
-        0x0330, 0x8335, 0x833F, 0x033A, 0x832B, 0x032E, 0x0324, 0x8321,
-        0x0360, 0x8365, 0x836F, 0x036A, 0x837B, 0x037E, 0x0374, 0x8371,
-        0x8353, 0x0356, 0x035C, 0x8359, 0x0348, 0x834D, 0x8347, 0x0342,
-        0x03C0, 0x83C5, 0x83CF, 0x03CA, 0x83DB, 0x03DE, 0x03D4, 0x83D1,
-        0x83F3, 0x03F6, 0x03FC, 0x83F9, 0x03E8, 0x83ED, 0x83E7, 0x03E2,
-        0x83A3, 0x03A6, 0x03AC, 0x83A9, 0x03B8, 0x83BD, 0x83B7, 0x03B2,
-        0x0390, 0x8395, 0x839F, 0x039A, 0x838B, 0x038E, 0x0384, 0x8381,
-        0x0280, 0x8285, 0x828F, 0x028A, 0x829B, 0x029E, 0x0294, 0x8291,
-        0x82B3, 0x02B6, 0x02BC, 0x82B9, 0x02A8, 0x82AD, 0x82A7, 0x02A2,
-        0x82E3, 0x02E6, 0x02EC, 0x82E9, 0x02F8, 0x82FD, 0x82F7, 0x02F2,
-        0x02D0, 0x82D5, 0x82DF, 0x02DA, 0x82CB, 0x02CE, 0x02C4, 0x82C1,
-        0x8243, 0x0246, 0x024C, 0x8249, 0x0258, 0x825D, 0x8257, 0x0252,
-        0x0270, 0x8275, 0x827F, 0x027A, 0x826B, 0x026E, 0x0264, 0x8261,
-        0x0220, 0x8225, 0x822F, 0x022A, 0x823B, 0x023E, 0x0234, 0x8231,
-        0x8213, 0x0216, 0x021C, 0x8219, 0x0208, 0x820D, 0x8207, 0x0202,
-    ]  # fmt: skip
+CRC_TABLE = (
+    0x0000, 0x8005, 0x800F, 0x000A, 0x801B, 0x001E, 0x0014, 0x8011,
+    0x8033, 0x0036, 0x003C, 0x8039, 0x0028, 0x802D, 0x8027, 0x0022,
+    0x8063, 0x0066, 0x006C, 0x8069, 0x0078, 0x807D, 0x8077, 0x0072,
+    0x0050, 0x8055, 0x805F, 0x005A, 0x804B, 0x004E, 0x0044, 0x8041,
+    0x80C3, 0x00C6, 0x00CC, 0x80C9, 0x00D8, 0x80DD, 0x80D7, 0x00D2,
+    0x00F0, 0x80F5, 0x80FF, 0x00FA, 0x80EB, 0x00EE, 0x00E4, 0x80E1,
+    0x00A0, 0x80A5, 0x80AF, 0x00AA, 0x80BB, 0x00BE, 0x00B4, 0x80B1,
+    0x8093, 0x0096, 0x009C, 0x8099, 0x0088, 0x808D, 0x8087, 0x0082,
+    0x8183, 0x0186, 0x018C, 0x8189, 0x0198, 0x819D, 0x8197, 0x0192,
+    0x01B0, 0x81B5, 0x81BF, 0x01BA, 0x81AB, 0x01AE, 0x01A4, 0x81A1,
+    0x01E0, 0x81E5, 0x81EF, 0x01EA, 0x81FB, 0x01FE, 0x01F4, 0x81F1,
+    0x81D3, 0x01D6, 0x01DC, 0x81D9, 0x01C8, 0x81CD, 0x81C7, 0x01C2,
+    0x0140, 0x8145, 0x814F, 0x014A, 0x815B, 0x015E, 0x0154, 0x8151,
+    0x8173, 0x0176, 0x017C, 0x8179, 0x0168, 0x816D, 0x8167, 0x0162,
+    0x8123, 0x0126, 0x012C, 0x8129, 0x0138, 0x813D, 0x8137, 0x0132,
+    0x0110, 0x8115, 0x811F, 0x011A, 0x810B, 0x010E, 0x0104, 0x8101,
+    0x8303, 0x0306, 0x030C, 0x8309, 0x0318, 0x831D, 0x8317, 0x0312,
+    0x0330, 0x8335, 0x833F, 0x033A, 0x832B, 0x032E, 0x0324, 0x8321,
+    0x0360, 0x8365, 0x836F, 0x036A, 0x837B, 0x037E, 0x0374, 0x8371,
+    0x8353, 0x0356, 0x035C, 0x8359, 0x0348, 0x834D, 0x8347, 0x0342,
+    0x03C0, 0x83C5, 0x83CF, 0x03CA, 0x83DB, 0x03DE, 0x03D4, 0x83D1,
+    0x83F3, 0x03F6, 0x03FC, 0x83F9, 0x03E8, 0x83ED, 0x83E7, 0x03E2,
+    0x83A3, 0x03A6, 0x03AC, 0x83A9, 0x03B8, 0x83BD, 0x83B7, 0x03B2,
+    0x0390, 0x8395, 0x839F, 0x039A, 0x838B, 0x038E, 0x0384, 0x8381,
+    0x0280, 0x8285, 0x828F, 0x028A, 0x829B, 0x029E, 0x0294, 0x8291,
+    0x82B3, 0x02B6, 0x02BC, 0x82B9, 0x02A8, 0x82AD, 0x82A7, 0x02A2,
+    0x82E3, 0x02E6, 0x02EC, 0x82E9, 0x02F8, 0x82FD, 0x82F7, 0x02F2,
+    0x02D0, 0x82D5, 0x82DF, 0x02DA, 0x82CB, 0x02CE, 0x02C4, 0x82C1,
+    0x8243, 0x0246, 0x024C, 0x8249, 0x0258, 0x825D, 0x8257, 0x0252,
+    0x0270, 0x8275, 0x827F, 0x027A, 0x826B, 0x026E, 0x0264, 0x8261,
+    0x0220, 0x8225, 0x822F, 0x022A, 0x823B, 0x023E, 0x0234, 0x8231,
+    0x8213, 0x0216, 0x021C, 0x8219, 0x0208, 0x820D, 0x8207, 0x0202,
+)  # fmt: skip
+
+
+# the word table takes about 2.6 MB and 30 ms to build, so only long frames use it
+CRC_WORD_MIN_SIZE = 32
+
+
+@lru_cache(maxsize=None)
+def crc_word_table() -> Tuple[int, ...]:
+    crc_table = CRC_TABLE
+
+    # crc of every 16 bit state after shifting in two more bytes
+    words = []
+    for crc in range(0x10000):
+        for _ in range(2):
+            crc = ((crc << 8) ^ crc_table[crc >> 8]) & 0xFFFF
+
+        words.append(crc)
+
+    return tuple(words)
+
+
+def calc_crc_16(packet: Sequence[int]) -> int:
+    # frames are already bytes-like, only plain int sequences need a copy
+    buffer = packet
+    if not isinstance(buffer, (bytes, bytearray, memoryview)):
+        buffer = bytes(buffer)
+
+    crc_table = CRC_TABLE
+
+    if len(buffer) < CRC_WORD_MIN_SIZE:
+        crc = 0
+        for byte in buffer:
+            crc = ((crc << 8) ^ crc_table[((crc >> 8) ^ byte) & 0xFF]) & 0xFFFF
+
+        return crc
+
+    word_table = crc_word_table()
 
     crc = 0
-    for byte in packet:
-        i = ((crc >> 8) ^ byte) & 0xFF
-        crc = (crc << 8) ^ crc_table[i]
-        crc = crc & 0xFFFF
+    for word in struct.unpack_from(f">{len(buffer) // 2}H", buffer):
+        crc = word_table[crc ^ word]
+
+    if len(buffer) % 2:
+        i = ((crc >> 8) ^ buffer[-1]) & 0xFF
+        crc = ((crc << 8) ^ crc_table[i]) & 0xFFFF
 
     return crc
 
 
+def crc_deltas(size: int, positions: Iterable[int]) -> Dict[int, Tuple[int, ...]]:
+    wanted = set(positions)
+    if not wanted:
+        return {}
+
+    # crc of a lone byte at the end of a zeroed frame, moved back one byte per step
+    table: Tuple[int, ...] = CRC_TABLE
+    deltas = {}
+    for position in range(size - 1, min(wanted) - 1, -1):
+        if position in wanted:
+            deltas[position] = table
+
+        table = tuple(((crc << 8) ^ CRC_TABLE[crc >> 8]) & 0xFFFF for crc in table)
+
+    return deltas
+
+
 class Params:
-    def __init__(self, params: Optional[List[int]] = None) -> None:
+    __slots__ = ("params",)
+
+    def __init__(self, params: Optional[Iterable[int]] = None) -> None:
         if params is None:
-            params = []
+            params = b""
 
-        self.params = params
+        self.params = bytearray(params)
 
     def add(self, value: int, n_bytes: int = 1, signed: bool = False) -> None:
-        self.params.extend(split_bytes(value, n_bytes=n_bytes, signed=signed))
+        self.params += value.to_bytes(n_bytes, "little", signed=signed)
 
     def parse_ping(self) -> Dict[str, int]:
         return {
@@ -107,41 +200,56 @@ class Params:
         return merge_bytes(self.params, signed=signed)
 
     def parse_nested(self, lengths: List[int], signs: List[bool]) -> List[int]:
-        packet = self.params[: lengths[0] + 1]
+        code = None
+        if len(set(lengths)) == 1 and len(set(signs)) == 1:
+            code = sync_code(lengths[0], signs[0])
 
-        data = []
-        data.append(merge_bytes(packet[1:], signs[0]))
+        if code is not None:
+            nested = nested_struct(code, len(lengths))
 
-        start = lengths[0] + 1
-        for length, sign in zip(lengths[1:], signs[1:]):
-            packet = self.params[start : start + length + 4]
+            if nested.size == len(self.params):
+                fields = nested.unpack_from(self.params)
 
-            error = packet[2]
-            if error & 0x80:
-                packet_id = packet[3]
-                raise HardwareError(packet_id)
+                for error, packet_id in zip(fields[1::3], fields[2::3]):
+                    if error & 0x80:
+                        raise HardwareError(packet_id)
 
-            start += length + 4
+                return list(fields[::3])
 
-            data.append(merge_bytes(packet[4:], sign))
+        with memoryview(self.params) as view:
+            data = []
+            data.append(merge_bytes(view[1 : lengths[0] + 1], signs[0]))
 
-        return data
+            start = lengths[0] + 1
+            for length, sign in zip(lengths[1:], signs[1:]):
+                error = view[start + 2]
+                if error & 0x80:
+                    packet_id = view[start + 3]
+                    raise HardwareError(packet_id)
+
+                data.append(merge_bytes(view[start + 4 : start + length + 4], sign))
+
+                start += length + 4
+
+            return data
 
     @property
     def raw(self) -> bytes:
         return bytes(self.params)
 
 
+def stuff_bytes(data: bytearray) -> bytearray:
+    return data.replace(b"\xff\xff\xfd", b"\xff\xff\xfd\xfd")
+
+
 def add_stuffing(params: Params) -> Params:
-    buffer = list(params.raw)
-    indices = [
-        i + 3 for i in range(len(buffer) - 2) if buffer[i : i + 3] == [0xFF, 0xFF, 0xFD]
-    ]
+    return Params(stuff_bytes(params.params))
 
-    for i in reversed(indices):
-        buffer.insert(i, 0xFD)
 
-    return Params(buffer)
+def stuff_frame(packet: bytearray) -> None:
+    # params start after the header, id, length and instruction
+    if packet.find(b"\xff\xff\xfd", 8) >= 0:
+        packet[8:] = stuff_bytes(packet[8:])
 
 
 @dataclass(frozen=True)
@@ -150,36 +258,59 @@ class InstructionPacket:
     instruction: int
     params: Params = field(default_factory=Params)
 
-    header: List[int] = field(
-        default_factory=lambda: [0xFF, 0xFF, 0xFD, 0x00],
-        init=False,
-    )
+    header: ClassVar[bytes] = HEADER
     length: int = field(init=False)
     crc: int = field(init=False)
+    _raw: bytes = field(init=False, repr=False, compare=False)
 
     @property
     def raw(self) -> bytes:
-        packet = []
-        packet.extend(self.header)
-        packet.append(self.packet_id)
-        packet.extend(split_bytes(self.length))
-        packet.append(self.instruction)
-        packet.extend(self.params.raw)
-        packet.extend(split_bytes(self.crc))
-        return bytes(packet)
+        return self._raw
 
     def __post_init__(self) -> None:
-        object.__setattr__(self, "length", len(self.params.raw) + 3)
-
-        packet = []
-        packet.extend(self.header)
+        packet = bytearray(self.header)
         packet.append(self.packet_id)
-        packet.extend(split_bytes(self.length))
+        packet += b"\x00\x00"
         packet.append(self.instruction)
-        params = add_stuffing(self.params)
-        packet.extend(params.raw)
+        packet += self.params.params
+        stuff_frame(packet)
+
+        object.__setattr__(self, "length", len(packet) - 5)
+        packet[5:7] = self.length.to_bytes(2, "little")
+
         object.__setattr__(self, "crc", calc_crc_16(packet))
 
+        packet += self.crc.to_bytes(2, "little")
+        object.__setattr__(self, "_raw", bytes(packet))
+
+
+@lru_cache(maxsize=None)
+def pack_command(dxl_id: int, instruction: int, params: bytes = b"") -> bytes:
+    # frames without runtime values only depend on the id, so build each once
+    return InstructionPacket(dxl_id, instruction, Params(params)).raw
+
+
+def pack_sync_write(
+    address: int, length: int, values: Dict[int, int], signed: bool = False
+) -> bytes:
+    packet = bytearray(HEADER)
+    packet.append(BROADCAST_ID)
+    packet += b"\x00\x00"
+    packet.append(SYNC_WRITE)
+    packet += address.to_bytes(2, "little")
+    packet += length.to_bytes(2, "little")
+
+    for dxl_id, value in values.items():
+        packet.append(dxl_id)
+        packet += value.to_bytes(length, "little", signed=signed)
+
+    stuff_frame(packet)
+
+    packet[5:7] = (len(packet) - 5).to_bytes(2, "little")
+    packet += calc_crc_16(packet).to_bytes(2, "little")
+
+    return bytes(packet)
+
 
 @dataclass
 class StatusPacket:
@@ -191,49 +322,51 @@ class StatusPacket:
     params: Params
     crc: int
 
-    def __init__(self, buffer: List[int]) -> None:
-        self.header = (buffer[0], buffer[1], buffer[2], buffer[3])
-        self.packet_id = buffer[4]
-        self.length = merge_bytes(buffer[5:7])
-        self.instruction, self.error = buffer[7:9]
-        self.params = Params(buffer[9:-2])
-        self.crc = merge_bytes(buffer[-2:])
+    def __init__(self, buffer: Sequence[int]) -> None:
+        raw = bytes(buffer)
+
+        self.header = (raw[0], raw[1], raw[2], raw[3])
+        fields = STATUS_FIELDS.unpack_from(raw, 4)
+        self.packet_id, self.length, self.instruction, self.error = fields
+        self.params = Params(memoryview(raw)[9:-2])
+        (self.crc,) = CRC_FIELD.unpack_from(raw, len(raw) - 2)
+
+        self._raw = raw
 
     @property
     def raw(self) -> bytes:
-        packet: List[int] = []
-        packet.extend(self.header)
-        packet.append(self.packet_id)
-        packet.extend(split_bytes(self.length))
-        packet.append(self.instruction)
-        packet.append(self.error)
-        packet.extend(self.params.raw)
-        packet.extend(split_bytes(self.crc))
-        return bytes(packet)
+        return self._raw
 
     @property
     def valid(self) -> bool:
-        return calc_crc_16(list(self.raw)[:-2]) == self.crc
+        return calc_crc_16(memoryview(self._raw)[:-2]) == self.crc
 
     def remove_stuffing(self) -> None:
-        params = list(self.params.raw)
-
-        indices = [
-            i + 3
-            for i in range(len(params) - 3)
-            if params[i : i + 4] == [0xFF, 0xFF, 0xFD, 0xFD]
-        ]
-
-        for i in reversed(indices):
-            params.pop(i)
+        # almost no frame is stuffed, so check before copying anything
+        if self.params.params.find(b"\xff\xff\xfd\xfd") < 0:
+            return
 
+        params = self.params.params.replace(b"\xff\xff\xfd\xfd", b"\xff\xff\xfd")
         self.params = Params(params)
-        self.crc = calc_crc_16(list(self.raw)[:-2])
+
+        packet = bytearray(self._raw[:9])
+        packet += params
+        self.crc = calc_crc_16(packet)
+        packet += self.crc.to_bytes(2, "little")
+        self._raw = bytes(packet)
 
 
 class HardwareError(Exception):
     """Hardware error."""
 
+    def __init__(self, dxl_id: int) -> None:
+        super().__init__(
+            f"Alert! There is a hardware issue with device id: {dxl_id}. "
+            "Check the hardware error status value of the control table."
+        )
+
+        self.dxl_id = dxl_id
+
 
 class Connection:
     def __init__(
@@ -243,37 +376,84 @@ class Connection:
 
         self.serial.port = port
 
+        self.buffer = bytearray()
+
     def open(self) -> None:
         self.serial.open()
 
+        # usb serial adapters buffer reads for up to 16ms unless told otherwise
+        with contextlib.suppress(AttributeError, ValueError, NotImplementedError):
+            self.serial.set_low_latency_mode(True)
+
+        self.buffer.clear()
+
     def close(self) -> None:
         self.serial.close()
+        self.buffer.clear()
 
     def set_baudrate(self, baudrate: int) -> None:
         self.serial.baudrate = baudrate
+        self.buffer.clear()
+
+    def prefetch(self, size: int) -> None:
+        # drain everything already received so later reads skip the syscall
+        if len(self.buffer) < size:
+            size_left = size - len(self.buffer)
+            self.buffer += self.serial.read(max(size_left, self.serial.in_waiting))
+
+    def read(self, size: int) -> bytearray:
+        self.prefetch(size)
+
+        data = self.buffer[:size]
+        del self.buffer[:size]
 
-    def read_header(self) -> List[int]:
-        header = [0xFF, 0xFF, 0xFD, 0x00]
+        return data
+
+    @contextlib.contextmanager
+    def batch(self, size: int) -> Generator[None, None, None]:
+        # wait once for the status packets of every motor
+        self.prefetch(size)
+
+        if len(self.buffer) >= size:
+            yield
+            return
+
+        # the batch already waited out the timeout, only parse what arrived
+        timeout = self.serial.timeout
+        self.serial.timeout = 0
+        try:
+            yield
+        finally:
+            self.serial.timeout = timeout
+
+    def read_header(self) -> bytearray:
+        header = HEADER
+        buffer = self.buffer
 
         length = len(header)
-        packet: List[int] = []
-        header_found = False
-        t0 = time.time()
-        while not header_found:
-            packet.extend(list(self.serial.read(length - len(packet))))
-
-            for _ in range(len(packet)):
-                if packet[:length] == header:
-                    header_found = True
-                    break
-
-                packet.pop(0)
-
-            if self.serial.timeout is not None and time.time() - t0 >= (
-                self.serial.timeout * length
-            ):
+
+        deadline = None
+        if self.serial.timeout is not None:
+            deadline = time.monotonic_ns() + int(self.serial.timeout * 1e9)
+
+        while True:
+            self.prefetch(length)
+
+            # skip any garbage in front of the header in one scan
+            index = buffer.find(header)
+            if index >= 0:
+                del buffer[:index]
+                break
+
+            # keep a trailing partial header for the next read
+            del buffer[: max(0, len(buffer) - length + 1)]
+
+            if deadline is not None and time.monotonic_ns() >= deadline:
                 break
 
+        packet = buffer[:length]
+        del buffer[:length]
+
         return packet
 
     def read_packet(self) -> Optional[StatusPacket]:
@@ -282,49 +462,50 @@ class Connection:
         if len(packet) < 4:
             return None
 
-        buffer = list(self.serial.read(3))
-        packet.extend(buffer)
+        # peek at the length so the id, length and body come out in one slice
+        self.prefetch(3)
 
-        if len(buffer) < 3:
+        if len(self.buffer) < 3:
+            self.buffer.clear()
             return None
 
-        packet_id, length_l, length_h = buffer
-        length = merge_bytes([length_l, length_h])
+        size = merge_bytes(self.buffer[1:3]) + 3
 
-        rest = list(self.serial.read(length))
-        packet.extend(rest)
+        rest = self.read(size)
+        packet += rest
 
-        if len(rest) < length:
+        if len(rest) < size:
             return None
 
         rx = StatusPacket(packet)
 
         if rx.error & 0x80:
-            msg = (
-                f"Alert! There is a hardware issue with device id: {packet_id}. ",
-                "Check the hardware error status value of the control table.",
-            )
-            raise HardwareError(msg)
+            raise HardwareError(rx.packet_id)
 
         return rx
 
     def stream_packets(
         self, count: Optional[int] = None
     ) -> Generator[Optional[StatusPacket], None, None]:
+        read_packet = self.read_packet
+
         if count is None:
             while True:
-                yield self.read_packet()
+                yield read_packet()
 
         else:
             for _ in range(count):
-                yield self.read_packet()
+                yield read_packet()
 
     def write_packet(self, tx: InstructionPacket) -> None:
-        buffer = tx.raw
+        self.write(tx.raw)
+
+    def write(self, buffer: bytes) -> None:
+        view = memoryview(buffer)
 
         count = 0
-        while count < len(buffer):
-            count = self.serial.write(buffer)
+        while count < len(view):
+            count += self.serial.write(view[count:])
 
 
 class SyncType(Enum):
@@ -334,9 +515,7 @@ class SyncType(Enum):
 
 class SyncParams(Params):
     def __init__(self, address: int, length: int, signed: bool = False) -> None:
-        super().__init__()
-        self.add(address, 2)
-        self.add(length, 2)
+        super().__init__(address.to_bytes(2, "little") + length.to_bytes(2, "little"))
 
         self.length = length
         self.num_motors = 0
@@ -350,7 +529,7 @@ class SyncParams(Params):
         else:
             assert self.type == SyncType.READ, "You can't mix add_motor and add_value"
 
-        self.add(dxl_id)
+        self.params.append(dxl_id)
         self.num_motors += 1
 
     def add_value(self, dxl_id: int, value: int) -> None:
@@ -359,11 +538,96 @@ class SyncParams(Params):
         else:
             assert self.type == SyncType.WRITE, "You can't mix add_motor and add_value"
 
-        self.add(dxl_id)
-        self.add(value, self.length, self.signed)
+        self.params.append(dxl_id)
+        self.params += value.to_bytes(self.length, "little", signed=self.signed)
 
         self.num_motors += 1
 
+    def add_values(self, dxl_ids: Sequence[int], values: Sequence[int]) -> None:
+        assert len(dxl_ids) == len(values), "Each id needs exactly one value"
+
+        code = sync_code(self.length, self.signed)
+        if code is None:
+            for dxl_id, value in zip(dxl_ids, values):
+                self.add_value(dxl_id, value)
+            return
+
+        if self.type is None:
+            self.type = SyncType.WRITE
+        else:
+            assert self.type == SyncType.WRITE, "You can't mix add_motor and add_value"
+
+        # pack every id and value pair in a single call
+        items = itertools.chain.from_iterable(zip(dxl_ids, values))
+        # keep the OverflowError that add_value raises for values out of range
+        try:
+            self.params += struct.pack(f"<{('B' + code) * len(dxl_ids)}", *items)
+        except struct.error as error:
+            raise OverflowError(error) from error
+
+        self.num_motors += len(dxl_ids)
+
+
+class SyncWriteTemplate:
+    def __init__(
+        self, address: int, length: int, dxl_ids: Sequence[int], signed: bool = False
+    ) -> None:
+        self.length = length
+        self.signed = signed
+
+        # each motor gets a single entry even if its id is listed twice
+        dxl_ids = list(dict.fromkeys(dxl_ids))
+
+        self.packet = bytearray(HEADER)
+        self.packet.append(BROADCAST_ID)
+        self.packet += (len(dxl_ids) * (length + 1) + 7).to_bytes(2, "little")
+        self.packet.append(SYNC_WRITE)
+        self.packet += address.to_bytes(2, "little")
+        self.packet += length.to_bytes(2, "little")
+
+        # values sit right after their id, entries start after the address and length
+        self.offsets = {}
+        for dxl_id in dxl_ids:
+            self.packet.append(dxl_id)
+            self.offsets[dxl_id] = len(self.packet)
+            self.packet += bytes(length)
+
+        self.crc = calc_crc_16(self.packet)
+
+        positions: List[int] = []
+        for start in self.offsets.values():
+            positions.extend(range(start, start + length))
+        self.deltas = crc_deltas(len(self.packet), positions)
+
+    def set_value(self, dxl_id: int, value: int) -> None:
+        start = self.offsets[dxl_id]
+        end = start + self.length
+
+        data = value.to_bytes(self.length, "little", signed=self.signed)
+
+        # the crc is linear, so only the flipped bits of each byte need folding in
+        crc = self.crc
+        deltas = self.deltas
+        for position, old, new in zip(range(start, end), self.packet[start:end], data):
+            crc ^= deltas[position][old ^ new]
+
+        self.crc = crc
+        self.packet[start:end] = data
+
+    @property
+    def raw(self) -> bytes:
+        packet = self.packet
+
+        # values that need stuffing change the frame length, so rebuild those
+        if packet.find(b"\xff\xff\xfd", 8) >= 0:
+            packet = bytearray(packet)
+            stuff_frame(packet)
+            packet[5:7] = (len(packet) - 5).to_bytes(2, "little")
+
+            return bytes(packet) + calc_crc_16(packet).to_bytes(2, "little")
+
+        return bytes(packet) + self.crc.to_bytes(2, "little")
+
 
 class BulkType(Enum):
     READ = 0
@@ -388,9 +652,9 @@ class BulkParams(Params):
         else:
             assert self.type == BulkType.READ, "You can't mix add_address and add_value"
 
-        self.add(dxl_id)
-        self.add(address, 2)
-        self.add(length, 2)
+        self.params.append(dxl_id)
+        self.params += address.to_bytes(2, "little")
+        self.params += length.to_bytes(2, "little")
 
         self.num_motors += 1
         self.lengths.append(length)
@@ -406,10 +670,10 @@ class BulkParams(Params):
                 "You can't mix add_address and add_value"
             )
 
-        self.add(dxl_id)
-        self.add(address, 2)
-        self.add(length, 2)
-        self.add(value, length, signed)
+        self.params.append(dxl_id)
+        self.params += address.to_bytes(2, "little")
+        self.params += length.to_bytes(2, "little")
+        self.params += value.to_bytes(length, "little", signed=signed)
 
         self.num_motors += 1
 
@@ -430,13 +694,12 @@ class MotorBus:
         self.conn.set_baudrate(baudrate)
 
     def ping(self, dxl_id: int) -> Response:
-        tx = InstructionPacket(dxl_id, PING)
-        self.conn.write_packet(tx)
+        self.conn.write(pack_command(dxl_id, PING))
 
         rx = self.conn.read_packet()
 
         if rx is None:
-            return Response(timeout=True)
+            return TIMEOUT
 
         if not rx.valid or rx.error:
             return Response(error=rx.error, valid=rx.valid)
@@ -448,8 +711,7 @@ class MotorBus:
         return Response(error=0, valid=True, data=data)
 
     def broadcast_ping(self) -> Response:
-        tx = InstructionPacket(BROADCAST_ID, PING)
-        self.conn.write_packet(tx)
+        self.conn.write(pack_command(BROADCAST_ID, PING))
 
         r = None
 
@@ -472,10 +734,9 @@ class MotorBus:
                 break
 
         if r is None:
-            return Response(timeout=True)
+            return TIMEOUT
 
-        r.data = data
-        return r
+        return replace(r, data=data)
 
     def scan(self, baudrates: Optional[List[int]] = None) -> Dict[int, Dict[str, int]]:
         if baudrates is None:
@@ -518,7 +779,7 @@ class MotorBus:
         rx = self.conn.read_packet()
 
         if rx is None:
-            return Response(timeout=True)
+            return TIMEOUT
 
         if not rx.valid or rx.error:
             return Response(error=rx.error, valid=rx.valid)
@@ -548,7 +809,7 @@ class MotorBus:
         rx = self.conn.read_packet()
 
         if rx is None:
-            return Response(timeout=True)
+            return TIMEOUT
 
         return Response(error=rx.error, valid=rx.valid, data=[])
 
@@ -563,20 +824,14 @@ class MotorBus:
         return self._write(dxl_id, REG_WRITE, address, length, value, signed)
 
     def _send(
-        self, dxl_id: int, instruction: int, buffer: Optional[List[int]] = None
+        self, dxl_id: int, instruction: int, params: Sequence[int] = ()
     ) -> Response:
-        if buffer is None:
-            buffer = []
-
-        params = Params(buffer)
-
-        tx = InstructionPacket(dxl_id, instruction, params)
-        self.conn.write_packet(tx)
+        self.conn.write(pack_command(dxl_id, instruction, bytes(params)))
 
         rx = self.conn.read_packet()
 
         if rx is None:
-            return Response(timeout=True)
+            return TIMEOUT
 
         if not rx.valid or rx.error:
             return Response(error=rx.error, valid=rx.valid)
@@ -615,36 +870,46 @@ class MotorBus:
         return self._send(dxl_id, CONTROL_TABLE_BACKUP, [0x02, 0x43, 0x54, 0x52, 0x4C])
 
     def _sync_read(
-        self, tx: InstructionPacket, count: int, signs: List[bool]
+        self, tx: InstructionPacket, signs: List[bool], size: int
     ) -> Response:
         self.conn.write_packet(tx)
 
-        data = []
-        for rx, signed in zip(self.conn.stream_packets(count=count), signs):
-            if rx is None:
-                return Response(timeout=True)
+        # wait for every status packet at once instead of one read per motor
+        with self.conn.batch(size):
+            read_packet = self.conn.read_packet
 
-            if not rx.valid or rx.error != 0:
-                return Response(error=rx.error, valid=rx.valid)
+            data = [0] * len(signs)
+            for index, signed in enumerate(signs):
+                rx = read_packet()
 
-            if rx.valid:
-                rx.remove_stuffing()
+                if rx is None:
+                    return TIMEOUT
 
-            data.append(rx.params.parse_bytes(signed))
+                if not rx.valid or rx.error != 0:
+                    return Response(error=rx.error, valid=rx.valid)
 
-        if len(data) == 0:
-            return Response(timeout=True)
+                if rx.valid:
+                    rx.remove_stuffing()
+
+                data[index] = rx.params.parse_bytes(signed)
 
         return Response(error=0, valid=True, data=data)
 
-    def sync_read(self, params: SyncParams) -> Response:
+    def make_sync_reader(self, params: SyncParams) -> Callable[[], Response]:
         assert params.num_motors > 0, "You need to add motors with SyncParams.add_motor"
 
+        # the request never changes for a fixed set of motors, so build it once
         tx = InstructionPacket(BROADCAST_ID, SYNC_READ, params)
+        signs = [params.signed] * params.num_motors
+        size = (params.length + 11) * params.num_motors
 
-        return self._sync_read(
-            tx, params.num_motors, [params.signed] * params.num_motors
-        )
+        def sync_read() -> Response:
+            return self._sync_read(tx, signs, size)
+
+        return sync_read
+
+    def sync_read(self, params: SyncParams) -> Response:
+        return self.make_sync_reader(params)()
 
     def sync_write(self, params: SyncParams) -> None:
         assert params.num_motors > 0, "You need to add values with SyncParams.add_value"
@@ -661,7 +926,7 @@ class MotorBus:
         rx = self.conn.read_packet()
 
         if rx is None:
-            return Response(timeout=True)
+            return TIMEOUT
 
         if not rx.valid or rx.error != 0:
             return Response(error=rx.error, valid=rx.valid)
@@ -680,7 +945,11 @@ class MotorBus:
         )
 
         tx = InstructionPacket(BROADCAST_ID, BULK_READ, params)
-        return self._sync_read(tx, params.num_motors, params.signs)
+        return self._sync_read(
+            tx,
+            params.signs,
+            sum(params.lengths) + 11 * params.num_motors,
+        )
 
     def bulk_write(self, params: BulkParams) -> None:
         assert params.num_motors > 0 and params.type == BulkType.WRITE, (
@@ -701,7 +970,7 @@ class MotorBus:
         rx = self.conn.read_packet()
 
         if rx is None:
-            return Response(timeout=True)
+            return TIMEOUT
 
         if not rx.valid or rx.error != 0:
             return Response(error=rx.error, valid=rx.valid)
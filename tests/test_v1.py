@@ -1,7 +1,20 @@
 import pytest
 from serial import Serial
 
-from dxl2.v1 import BulkParams, Connection, MotorBus, SyncParams, calc_checksum
+from dxl2.v1 import (
+    BulkParams,
+    Connection,
+    InstructionPacket,
+    MotorBus,
+    Params,
+    SyncParams,
+    SyncWriteTemplate,
+    calc_checksum,
+    pack_command,
+    pack_read,
+    pack_sync_write,
+    pack_write,
+)
 
 TIMEOUT = 0.01
 
@@ -50,6 +63,70 @@ def build_rx(packet_id=ID, error=ERROR, params=PARAMS):
     return packet
 
 
+def test_v1_instruction_packet_raw():
+    tx = InstructionPacket(ID, READ, Params([0x2B, 0x04]))
+
+    assert tx.raw == bytes(build_tx(instruction=READ, params=[0x2B, 0x04]))
+
+
+def test_v1_pack_command():
+    packet = pack_command(ID, REBOOT)
+
+    assert packet == bytes(build_tx(ID, REBOOT, []))
+    assert pack_command(ID, REBOOT) is packet
+
+
+def test_v1_pack_read():
+    tx = InstructionPacket(ID, READ, Params([0x2B, 0x04]))
+
+    assert pack_read(ID, 0x2B, 0x04) == tx.raw
+
+
+def test_v1_pack_write():
+    params = Params([0x1E])
+    params.add(-2, 2, signed=True)
+
+    tx = InstructionPacket(ID, WRITE, params)
+
+    assert pack_write(ID, WRITE, 0x1E, 2, -2, signed=True) == tx.raw
+
+
+def test_v1_pack_sync_write():
+    params = SyncParams(0x1E, 4)
+    params.add_value(ID, 0x01500010)
+    params.add_value(ID + 1, 0x03600220)
+
+    tx = InstructionPacket(BROADCAST_ID, SYNC_WRITE, params)
+    packet = pack_sync_write(0x1E, 4, {ID: 0x01500010, ID + 1: 0x03600220})
+
+    assert packet == tx.raw
+
+
+def test_v1_sync_write_template():
+    template = SyncWriteTemplate(0x1E, 4, [ID, ID + 1])
+    template.set_value(ID, 0x7FFFFFFF)
+    template.set_value(ID, 0x01500010)
+    template.set_value(ID + 1, 0x03600220)
+
+    packet = pack_sync_write(0x1E, 4, {ID: 0x01500010, ID + 1: 0x03600220})
+
+    assert template.raw == packet
+
+
+def test_v1_open_without_low_latency(mock_serial, monkeypatch):
+    def set_low_latency_mode(self, low_latency_settings):
+        raise NotImplementedError("Low latency not supported on this platform")
+
+    monkeypatch.setattr(Serial, "set_low_latency_mode", set_low_latency_mode)
+
+    conn = Connection(mock_serial.port, timeout=TIMEOUT)
+    conn.open()
+
+    assert conn.serial.is_open
+
+    conn.close()
+
+
 @pytest.fixture
 def conn(mock_serial):
     conn = Connection(mock_serial.port, timeout=TIMEOUT)
@@ -181,6 +258,36 @@ def test_v1_ping(mock_serial, bus):
     assert stub.calls == 1
 
 
+def test_v1_scan(mock_serial, bus):
+    tx_0 = build_tx(0x00, PING, params=[])
+    tx_1 = build_tx(instruction=PING, params=[])
+    rx = build_rx(params=[])
+
+    # id 0 stays silent, its stub only keeps later pings lined up with the stubs
+    mock_serial.stub(receive_bytes=bytes(tx_0), send_bytes=b"")
+    stub = mock_serial.stub(receive_bytes=bytes(tx_1), send_bytes=bytes(rx))
+
+    motors = bus.scan(baudrates=[57600], timeout=0.001)
+
+    assert motors == {57600: [ID]}
+    assert bus.conn.serial.timeout == TIMEOUT
+
+    assert stub.called
+    assert stub.calls == 1
+
+
+def test_v1_scan_restores_timeout(bus, monkeypatch):
+    def ping(dxl_id):
+        raise RuntimeError
+
+    monkeypatch.setattr(bus, "ping", ping)
+
+    with pytest.raises(RuntimeError):
+        bus.scan(baudrates=[57600], timeout=0.001)
+
+    assert bus.conn.serial.timeout == TIMEOUT
+
+
 def test_v1_read(mock_serial, bus):
     tx = build_tx(instruction=READ, params=[0x2B, 0x04])
     rx = build_rx(params=[0x20, 0x01, 0x02, 0x03])
@@ -287,6 +394,30 @@ def test_v1_sync_write(mock_serial, bus):
     assert stub.calls == 1
 
 
+def test_v1_sync_params_add_values():
+    expected = SyncParams(0x1E, 2, signed=True)
+    expected.add_value(ID, -2)
+    expected.add_value(ID + 1, 0x0150)
+
+    params = SyncParams(0x1E, 2, signed=True)
+    params.add_values([ID, ID + 1], [-2, 0x0150])
+
+    assert params.raw == expected.raw
+    assert params.num_motors == 2
+
+
+def test_v1_sync_params_out_of_range():
+    params = SyncParams(0x1E, 2)
+
+    with pytest.raises(OverflowError):
+        params.add_value(ID, -1)
+
+    with pytest.raises(OverflowError):
+        params.add_values([ID], [0x10000])
+
+    assert params.num_motors == 0
+
+
 def test_v1_bulk_read(mock_serial, bus):
     tx = build_tx(
         BROADCAST_ID, BULK_READ, params=[0x00, 0x02, ID, 0x1E, 0x04, ID + 1, 0x24]
@@ -307,3 +438,40 @@ def test_v1_bulk_read(mock_serial, bus):
 
     assert stub.called
     assert stub.calls == 1
+
+
+def test_v1_bulk_read_missing_motor(mock_serial, bus, monkeypatch):
+    tx = build_tx(
+        BROADCAST_ID, BULK_READ, params=[0x00, 0x02, ID, 0x1E, 0x04, ID + 1, 0x24]
+    )
+    rx_1 = build_rx(ID, params=[0x01, 0x82])
+
+    stub = mock_serial.stub(receive_bytes=bytes(tx), send_bytes=bytes(rx_1))
+
+    params = BulkParams()
+    params.add_address(ID, 0x1E, 2)
+    params.add_address(ID + 1, 0x24, 4)
+
+    # a read that comes back short with a timeout set waited out that timeout
+    waits = []
+    read = bus.conn.serial.read
+
+    def recording_read(size=1):
+        data = read(size)
+        if bus.conn.serial.timeout and len(data) < size:
+            waits.append(size)
+
+        return data
+
+    monkeypatch.setattr(bus.conn.serial, "read", recording_read)
+
+    r = bus.bulk_read(params)
+
+    assert not r.ok
+
+    # only a single timeout is waited out for the missing motor
+    assert len(waits) == 1
+    assert bus.conn.serial.timeout == TIMEOUT
+
+    assert stub.called
+    assert stub.calls == 1
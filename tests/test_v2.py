@@ -1,12 +1,19 @@
 import pytest
+from serial import Serial
 
 from dxl2.v2 import (
     BulkParams,
     Connection,
     HardwareError,
+    InstructionPacket,
     MotorBus,
+    Params,
     SyncParams,
+    SyncWriteTemplate,
+    add_stuffing,
     calc_crc_16,
+    pack_command,
+    pack_sync_write,
     split_bytes,
 )
 
@@ -63,6 +70,116 @@ def build_rx(packet_id=ID, error=ERROR, params=PARAMS):
     return packet
 
 
+def test_v2_calc_crc_16():
+    assert calc_crc_16([0xFF, 0xFF, 0xFD, 0x00, 0x01, 0x03, 0x00, 0x01]) == 0x4E19
+    assert calc_crc_16([0xFF, 0xFF, 0xFD, 0x00, 0x01, 0x04, 0x00, 0x06, 0x01]) == 0xE6A1
+
+
+def test_v2_calc_crc_16_long_frame():
+    assert calc_crc_16(bytes(range(64))) == 0x41DD
+    assert calc_crc_16(bytes(range(65))) == 0x5D05
+
+
+def test_v2_add_stuffing():
+    params = add_stuffing(Params([0x01, 0xFF, 0xFF, 0xFD, 0xFF, 0xFF, 0xFD]))
+
+    assert params.raw == bytes([0x01, 0xFF, 0xFF, 0xFD, 0xFD, 0xFF, 0xFF, 0xFD, 0xFD])
+
+
+def test_v2_instruction_packet_raw():
+    tx = InstructionPacket(ID, WRITE, Params([0x74, 0x01, 0xFF, 0xFF, 0xFD]))
+    packet = build_tx(instruction=WRITE, params=[0x74, 0x01, 0xFF, 0xFF, 0xFD, 0xFD])
+
+    assert tx.raw == bytes(packet)
+
+
+def test_v2_pack_command():
+    packet = pack_command(ID, FACTORY_RESET, b"\x01")
+
+    assert packet == bytes(build_tx(ID, FACTORY_RESET, [0x01]))
+    assert pack_command(ID, FACTORY_RESET, b"\x01") is packet
+
+
+def test_v2_pack_sync_write():
+    params = SyncParams(0x0174, 4)
+    params.add_value(1, 0x01010196)
+    params.add_value(2, 0xFDFFFF00)
+
+    tx = InstructionPacket(BROADCAST_ID, SYNC_WRITE, params)
+    packet = pack_sync_write(0x0174, 4, {1: 0x01010196, 2: 0xFDFFFF00})
+
+    assert packet == tx.raw
+
+
+def test_v2_sync_params_add_values():
+    expected = SyncParams(0x0174, 4, signed=True)
+    expected.add_value(1, -2)
+    expected.add_value(2, 0x01210136)
+
+    params = SyncParams(0x0174, 4, signed=True)
+    params.add_values([1, 2], [-2, 0x01210136])
+
+    assert params.raw == expected.raw
+    assert params.num_motors == 2
+
+
+def test_v2_sync_params_out_of_range():
+    params = SyncParams(0x0174, 2)
+
+    with pytest.raises(OverflowError):
+        params.add_values([ID], [-1])
+
+    assert params.num_motors == 0
+
+
+def test_v2_sync_write_template():
+    template = SyncWriteTemplate(0x0174, 4, [1, 2])
+    template.set_value(1, 0x01010196)
+    template.set_value(2, 0x01210136)
+
+    assert template.raw == pack_sync_write(0x0174, 4, {1: 0x01010196, 2: 0x01210136})
+
+    template.set_value(1, 0xFDFFFF00)
+
+    assert template.raw == pack_sync_write(0x0174, 4, {1: 0xFDFFFF00, 2: 0x01210136})
+
+    template.set_value(2, 0xFFFFFFFF)
+
+    assert template.raw == pack_sync_write(0x0174, 4, {1: 0xFDFFFF00, 2: 0xFFFFFFFF})
+
+    template.set_value(1, 0x00000102)
+
+    assert template.raw == pack_sync_write(0x0174, 4, {1: 0x00000102, 2: 0xFFFFFFFF})
+
+
+def test_v2_sync_write_template_duplicate_ids():
+    template = SyncWriteTemplate(0x0174, 4, [1, 1, 2])
+    template.set_value(1, 0x01010196)
+    template.set_value(2, 0x01210136)
+
+    assert template.raw == pack_sync_write(0x0174, 4, {1: 0x01010196, 2: 0x01210136})
+
+
+def test_v2_sync_write_template_no_ids():
+    template = SyncWriteTemplate(0x0174, 4, [])
+
+    assert template.raw == pack_sync_write(0x0174, 4, {})
+
+
+def test_v2_open_without_low_latency(mock_serial, monkeypatch):
+    def set_low_latency_mode(self, low_latency_settings):
+        raise NotImplementedError("Low latency not supported on this platform")
+
+    monkeypatch.setattr(Serial, "set_low_latency_mode", set_low_latency_mode)
+
+    conn = Connection(mock_serial.port, timeout=TIMEOUT)
+    conn.open()
+
+    assert conn.serial.is_open
+
+    conn.close()
+
+
 @pytest.fixture
 def conn(mock_serial):
     conn = Connection(mock_serial.port, timeout=TIMEOUT)
@@ -116,6 +233,33 @@ def test_v2_read_packet_with_residue(mock_serial, conn):
     assert stub.calls == 1
 
 
+def test_v2_read_header_split_after_two_bytes(conn, monkeypatch):
+    # the first two header bytes arrive alone, then nothing, then the rest
+    chunks = [b"\xff\xff", b"", b"\xfd\x00"]
+    monkeypatch.setattr(conn.serial, "read", lambda size: chunks.pop(0))
+
+    assert conn.read_header() == bytearray([0xFF, 0xFF, 0xFD, 0x00])
+
+
+def test_v2_read_packet_with_partial_header_residue(mock_serial, conn):
+    rx = build_rx(params=[0x01])
+    rx = [0x00, 0xFF, 0xFF, 0xFD, 0x01, 0xFF, 0xFF, *rx]
+    stub = mock_serial.stub(receive_bytes=b"x", send_bytes=bytes(rx))
+
+    conn.serial.write(b"x")
+
+    rx = conn.read_packet()
+
+    assert rx is not None
+
+    assert rx.valid
+
+    assert rx.params.raw == bytes([0x01])
+
+    assert stub.called
+    assert stub.calls == 1
+
+
 def test_v2_read_packet_header_timeout(mock_serial, conn):
     rx = []
     stub = mock_serial.stub(receive_bytes=b"x", send_bytes=bytes(rx))
@@ -182,9 +326,11 @@ def test_v2_read_packet_raises(mock_serial, conn):
 
     conn.serial.write(b"x")
 
-    with pytest.raises(HardwareError):
+    with pytest.raises(HardwareError, match="device id: 1\\. Check") as e:
         conn.read_packet()
 
+    assert e.value.dxl_id == ID
+
     assert stub.called
     assert stub.calls == 1
 
@@ -415,6 +561,63 @@ def test_v2_sync_read(mock_serial, bus):
     assert stub.calls == 1
 
 
+def test_v2_sync_read_missing_motor(mock_serial, bus, monkeypatch):
+    tx = build_tx(BROADCAST_ID, SYNC_READ, params=[0x84, 0x01, 0x04, 0x00, 0x01, 0x02])
+    rx_1 = build_rx(params=[0xA6, 0x01, 0x01, 0x01])
+
+    stub = mock_serial.stub(receive_bytes=bytes(tx), send_bytes=bytes(rx_1))
+
+    params = SyncParams(0x0184, 4)
+    params.add_motor(ID)
+    params.add_motor(ID + 1)
+
+    # a read that comes back short with a timeout set waited out that timeout
+    waits = []
+    read = bus.conn.serial.read
+
+    def recording_read(size=1):
+        data = read(size)
+        if bus.conn.serial.timeout and len(data) < size:
+            waits.append(size)
+
+        return data
+
+    monkeypatch.setattr(bus.conn.serial, "read", recording_read)
+
+    r = bus.sync_read(params)
+
+    assert not r.ok
+
+    # only a single timeout is waited out for the missing motor
+    assert len(waits) == 1
+    assert bus.conn.serial.timeout == TIMEOUT
+
+    assert stub.called
+    assert stub.calls == 1
+
+
+def test_v2_make_sync_reader(mock_serial, bus):
+    tx = build_tx(BROADCAST_ID, SYNC_READ, params=[0x84, 0x01, 0x04, 0x00, 0x01, 0x02])
+
+    rx_1 = build_rx(params=[0xA6, 0x01, 0x01, 0x01])
+    rx_2 = build_rx(ID + 1, params=[0xB6, 0x01, 0x01, 0x01])
+
+    stub = mock_serial.stub(receive_bytes=bytes(tx), send_bytes=bytes(rx_1 + rx_2))
+
+    params = SyncParams(0x0184, 4)
+    params.add_motor(ID)
+    params.add_motor(ID + 1)
+
+    sync_read = bus.make_sync_reader(params)
+    r = sync_read()
+
+    assert r.ok
+    assert r.data == [0x010101A6, 0x010101B6]
+
+    assert stub.called
+    assert stub.calls == 1
+
+
 def test_v2_sync_read_partial(mock_serial, bus):
     tx = build_tx(BROADCAST_ID, SYNC_READ, params=[0x84, 0x01, 0x04, 0x00, 0x01, 0x02])
 